@@ -0,0 +1,33 @@
+"""Drop plaintext key column from apikey
+
+Revision ID: 1e37a9909aee
+Revises: 8305443076db
+Create Date: 2026-10-15 09:42:55.635250
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '1e37a9909aee'
+down_revision = '8305443076db'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Replace the placeholder hashes with real SHA-256 digests while the raw
+    # keys are still available, then stop storing the raw keys
+    op.execute(
+        "UPDATE apikey SET hashed_key = encode(sha256(convert_to(key, 'UTF8')), 'hex')"
+    )
+    op.drop_index('ix_apikey_key', table_name='apikey')
+    op.drop_column('apikey', 'key')
+
+
+def downgrade():
+    # The raw keys cannot be recovered, so the column comes back empty
+    op.add_column('apikey', sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index('ix_apikey_key', 'apikey', ['key'], unique=True)
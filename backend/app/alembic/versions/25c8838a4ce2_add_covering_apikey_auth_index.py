@@ -0,0 +1,33 @@
+"""Add covering apikey auth index
+
+Revision ID: 25c8838a4ce2
+Revises: edb63ccbe287
+Create Date: 2026-10-15 10:24:55.447721
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '25c8838a4ce2'
+down_revision = 'edb63ccbe287'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_apikey_auth',
+        'apikey',
+        ['hashed_key'],
+        unique=True,
+        postgresql_include=['is_active', 'revoked', 'expires_at'],
+    )
+    op.drop_index(op.f('ix_apikey_hashed_key'), table_name='apikey')
+
+
+def downgrade():
+    op.create_index(op.f('ix_apikey_hashed_key'), 'apikey', ['hashed_key'], unique=True)
+    op.drop_index('ix_apikey_auth', table_name='apikey')
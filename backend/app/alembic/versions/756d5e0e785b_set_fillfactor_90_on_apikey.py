@@ -0,0 +1,26 @@
+"""Set fillfactor 90 on apikey
+
+Revision ID: 756d5e0e785b
+Revises: 25c8838a4ce2
+Create Date: 2026-10-15 10:31:11.695071
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '756d5e0e785b'
+down_revision = '25c8838a4ce2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Leave free space on each page so last_used_at updates qualify for HOT
+    op.execute('ALTER TABLE apikey SET (fillfactor = 90)')
+
+
+def downgrade():
+    op.execute('ALTER TABLE apikey RESET (fillfactor)')
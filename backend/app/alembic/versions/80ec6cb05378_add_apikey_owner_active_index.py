@@ -0,0 +1,31 @@
+"""Add partial index for listing active api keys
+
+Revision ID: 80ec6cb05378
+Revises: 1e37a9909aee
+Create Date: 2026-10-15 09:49:37.233650
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '80ec6cb05378'
+down_revision = '1e37a9909aee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_apikey_owner_active',
+        'apikey',
+        ['owner_id', 'revoked', 'expires_at'],
+        unique=False,
+        postgresql_where=sa.text('revoked = false'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_apikey_owner_active', table_name='apikey')
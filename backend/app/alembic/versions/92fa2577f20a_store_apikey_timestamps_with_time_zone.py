@@ -0,0 +1,38 @@
+"""Store apikey timestamps with time zone
+
+Revision ID: 92fa2577f20a
+Revises: 80ec6cb05378
+Create Date: 2026-10-15 09:56:10.435976
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '92fa2577f20a'
+down_revision = '80ec6cb05378'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing values were written as naive UTC
+    for column in ('expires_at', 'created_at', 'last_used_at', 'revoked_at'):
+        op.alter_column(
+            'apikey',
+            column,
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade():
+    for column in ('expires_at', 'created_at', 'last_used_at', 'revoked_at'):
+        op.alter_column(
+            'apikey',
+            column,
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
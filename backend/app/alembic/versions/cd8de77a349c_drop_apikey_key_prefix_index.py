@@ -0,0 +1,25 @@
+"""Drop apikey key_prefix index
+
+Revision ID: cd8de77a349c
+Revises: f42a054b3ff1
+Create Date: 2026-10-15 10:10:14.594162
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'cd8de77a349c'
+down_revision = 'f42a054b3ff1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index(op.f('ix_apikey_key_prefix'), table_name='apikey')
+
+
+def downgrade():
+    op.create_index(op.f('ix_apikey_key_prefix'), 'apikey', ['key_prefix'], unique=False)
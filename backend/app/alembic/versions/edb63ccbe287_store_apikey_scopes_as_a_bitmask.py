@@ -0,0 +1,56 @@
+"""Store apikey scopes as a bitmask
+
+Revision ID: edb63ccbe287
+Revises: cd8de77a349c
+Create Date: 2026-10-15 10:17:08.480960
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'edb63ccbe287'
+down_revision = 'cd8de77a349c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('apikey', sa.Column('scopes_mask', sa.SmallInteger(), nullable=True))
+    op.execute(
+        """
+        UPDATE apikey SET scopes_mask = (
+            SELECT COALESCE(bit_or(bits.bit), 0)
+            FROM json_array_elements_text(apikey.scopes) AS scope
+            JOIN (VALUES
+                ('accounts:read', 1),
+                ('accounts:write', 2),
+                ('webhooks:read', 4),
+                ('webhooks:write', 8)
+            ) AS bits (name, bit) ON bits.name = scope
+        )
+        """
+    )
+    op.alter_column('apikey', 'scopes_mask', nullable=False)
+    op.drop_column('apikey', 'scopes')
+
+
+def downgrade():
+    op.add_column('apikey', sa.Column('scopes', sa.JSON(), nullable=True))
+    op.execute(
+        """
+        UPDATE apikey SET scopes = (
+            SELECT COALESCE(json_agg(bits.name ORDER BY bits.bit), '[]'::json)
+            FROM (VALUES
+                ('accounts:read', 1),
+                ('accounts:write', 2),
+                ('webhooks:read', 4),
+                ('webhooks:write', 8)
+            ) AS bits (name, bit)
+            WHERE apikey.scopes_mask & bits.bit <> 0
+        )
+        """
+    )
+    op.drop_column('apikey', 'scopes_mask')
@@ -0,0 +1,25 @@
+"""Add unique index on apikey hashed_key
+
+Revision ID: f42a054b3ff1
+Revises: 92fa2577f20a
+Create Date: 2026-10-15 10:03:52.771120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f42a054b3ff1'
+down_revision = '92fa2577f20a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_apikey_hashed_key'), 'apikey', ['hashed_key'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_apikey_hashed_key'), table_name='apikey')
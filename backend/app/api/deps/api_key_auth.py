@@ -1,52 +1,124 @@
-from datetime import datetime
-from typing import Optional, List, Annotated
-from fastapi import Depends, HTTPException, Security, status
+import functools
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Optional, cast
+from fastapi import Depends, HTTPException, Request, Security, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyHeader
-from sqlmodel import Session, select
+from sqlalchemy.orm import QueryableAttribute, contains_eager
+from sqlmodel import Session, col, select
 
-from app.models import ApiKey, User, ScopeType
-from app.api.deps import get_db, SessionDep
+from app import crud
+from app.models import ApiKey, User, ScopeType, scopes_from_mask, scopes_to_mask
+from app.api.deps.auth import get_db, SessionDep
+from app.core.cache import (
+    get_api_key_cache,
+    pop_api_key_last_used,
+    record_api_key_last_used,
+    set_api_key_cache,
+)
+from app.core.clock import now
+from app.core.db import engine
+from app.core.security import hash_api_key
 
 # API key header configuration
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# SQLModel types relationship attributes as the related model, SQLAlchemy's
+# join and loader options expect the instrumented attribute it is at runtime
+_API_KEY_OWNER = cast(QueryableAttribute[User], ApiKey.owner)
+
+
+def _is_api_key_valid(api_key: ApiKey) -> bool:
+    """Check if key is active, not revoked, and not expired"""
+    if not api_key.is_active or api_key.revoked:
+        return False
+    return api_key.expires_at is None or api_key.expires_at >= now()
+
 
 async def get_api_key(
+    request: Request,
     session: SessionDep,
     api_key_header: str = Security(API_KEY_HEADER),
 ) -> Optional[ApiKey]:
     """
     Validate the API key from header and return the associated ApiKey object.
     Returns None if no API key was provided or if the key is invalid.
+
+    Lookups are cached in Redis for a short TTL, so steady-state validation
+    does not hit the database. On a cache miss the owner is loaded in the
+    same query and kept on request.state for get_api_key_user. Revoking a
+    key leaves a tombstone that stops a lookup racing the revoke from
+    caching it again, so a revoked key is rejected immediately.
     """
     if not api_key_header:
         return None
-    
-    # In a real implementation, you would hash the API key before querying
-    # This is a simplified version for demonstration
-    query = select(ApiKey).where(ApiKey.key == api_key_header)
+
+    key_digest = hash_api_key(api_key_header)
+
+    cached = await get_api_key_cache(key_digest)
+    if cached is not None:
+        cached_api_key = ApiKey.model_validate(cached)
+        if not _is_api_key_valid(cached_api_key):
+            return None
+        await _touch_api_key(session, cached_api_key)
+        return cached_api_key
+
+    # Single lookup on ix_apikey_auth, inactive, revoked and expired keys are
+    # rejected from the index columns
+    query = (
+        select(ApiKey)
+        .join(_API_KEY_OWNER)
+        .options(contains_eager(_API_KEY_OWNER))
+        .where(
+            col(ApiKey.hashed_key) == key_digest,
+            col(ApiKey.is_active),
+            ~col(ApiKey.revoked),
+            col(ApiKey.expires_at).is_(None) | (col(ApiKey.expires_at) >= now()),
+        )
+    )
     api_key = session.exec(query).first()
     
     if not api_key:
         return None
     
-    # Check if key is active, not revoked, and not expired
-    if (
-        not api_key.is_active
-        or api_key.revoked
-        or (api_key.expires_at and api_key.expires_at < datetime.utcnow())
-    ):
-        return None
-    
-    # Update last used timestamp
-    api_key.last_used_at = datetime.utcnow()
-    session.add(api_key)
-    session.commit()
+    # Read before _touch_api_key, whose fallback commit expires the instance
+    request.state.api_key_user = api_key.owner
+    await set_api_key_cache(
+        key_digest, api_key.model_dump(mode="json")
+    )
+    await _touch_api_key(session, api_key)
     
     return api_key
 
 
+async def _touch_api_key(session: Session, api_key: ApiKey) -> None:
+    """
+    Record the last used timestamp. Writes are buffered in Redis and flushed
+    in batches by flush_api_key_last_used, falling back to a direct update
+    when Redis is unavailable.
+    """
+    used_at = now()
+    if not await record_api_key_last_used(api_key.id, used_at):
+        crud.update_api_keys_last_used(
+            session=session, last_used={api_key.id: used_at}
+        )
+
+
+async def flush_api_key_last_used() -> None:
+    """Write all buffered last used timestamps with a single UPDATE."""
+    last_used = await pop_api_key_last_used()
+    if not last_used:
+        return
+
+    def _write() -> None:
+        with Session(engine) as session:
+            crud.update_api_keys_last_used(session=session, last_used=last_used)
+
+    await run_in_threadpool(_write)
+
+
 async def get_api_key_user(
+    request: Request,
     session: SessionDep,
     api_key: Optional[ApiKey] = Depends(get_api_key),
 ) -> Optional[User]:
@@ -56,18 +128,29 @@ async def get_api_key_user(
     """
     if not api_key:
         return None
-    
-    query = select(User).where(User.id == api_key.owner_id)
-    user = session.exec(query).first()
+
+    # Already loaded by get_api_key on a cache miss. On a cache hit it is a
+    # primary key lookup, the owner is deliberately not cached so changes
+    # to the user (is_active, is_superuser) apply immediately
+    user: Optional[User] = getattr(request.state, "api_key_user", None)
+    if user is None:
+        user = session.get(User, api_key.owner_id)
     
     return user
 
 
-def require_api_key_with_scopes(required_scopes: List[ScopeType]):
+@functools.cache
+def require_api_key_with_scopes(
+    required_scopes: frozenset[ScopeType],
+) -> Callable[[Optional[ApiKey]], Awaitable[ApiKey]]:
     """
     Dependency factory that requires a valid API key with specific scopes.
-    Usage: Depends(require_api_key_with_scopes([ScopeType.ACCOUNTS_READ]))
+    Usage: Depends(require_api_key_with_scopes(frozenset({ScopeType.ACCOUNTS_READ})))
+
+    Results are cached per scope set, so equal scope sets share one
+    dependency and FastAPI resolves it once per request.
     """
+    required_mask = scopes_to_mask(required_scopes)
     
     async def validate_api_key_scopes(
         api_key: Optional[ApiKey] = Depends(get_api_key),
@@ -81,13 +164,13 @@ def require_api_key_with_scopes(required_scopes: List[ScopeType]):
             )
         
         # Check if the API key has all required scopes
-        api_key_scopes = set(api_key.scopes)
-        for scope in required_scopes:
-            if scope not in api_key_scopes:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"API key missing required scope: {scope.value}",
-                )
+        missing_mask = required_mask & ~api_key.scopes_mask
+        if missing_mask:
+            missing = scopes_from_mask(missing_mask)[0]
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"API key missing required scope: {missing.value}",
+            )
         
         return api_key
     
@@ -95,7 +178,15 @@ def require_api_key_with_scopes(required_scopes: List[ScopeType]):
 
 
 # Common dependencies for specific scope combinations
-require_accounts_read = require_api_key_with_scopes([ScopeType.ACCOUNTS_READ])
-require_accounts_write = require_api_key_with_scopes([ScopeType.ACCOUNTS_WRITE])
-require_webhooks_read = require_api_key_with_scopes([ScopeType.WEBHOOKS_READ])
-require_webhooks_write = require_api_key_with_scopes([ScopeType.WEBHOOKS_WRITE])
+require_accounts_read = require_api_key_with_scopes(
+    frozenset({ScopeType.ACCOUNTS_READ})
+)
+require_accounts_write = require_api_key_with_scopes(
+    frozenset({ScopeType.ACCOUNTS_WRITE})
+)
+require_webhooks_read = require_api_key_with_scopes(
+    frozenset({ScopeType.WEBHOOKS_READ})
+)
+require_webhooks_write = require_api_key_with_scopes(
+    frozenset({ScopeType.WEBHOOKS_WRITE})
+)
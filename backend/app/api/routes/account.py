@@ -1,20 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from collections.abc import AsyncIterator
+from fastapi import APIRouter, Body, HTTPException, Depends, Request, Response, status
+from pydantic import BaseModel, Discriminator, Field, Tag
 from sqlmodel import select
-from typing import Optional, Dict, List, Any, Union, Literal
+from typing import Annotated, Optional, Dict, List, Any, Union, Literal
 from datetime import datetime
-import uuid
+from uuid_utils.compat import uuid7
 import logging
 from app.api.deps.auth import CurrentUser, SessionDep
 from app.models import User
-from app.core.security import get_password_hash
+from app.core.security import encrypt_secret, get_password_hash
 
 # LinkedIn specific imports
-import requests
+import asyncio
+import httpx
 import json
-import time
+import orjson
+import re
+from urllib.parse import urlparse, parse_qs
 from app.core.config import settings
+from app.core.clock import now
+from app.core.queue import (
+    get_arq_redis,
+    get_linkedin_auth_state,
+    set_linkedin_auth_state,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -44,6 +53,23 @@ class LinkedInCookieAuth(BaseModel):
     disabled_features: Optional[List[str]] = None
 
 
+def _linkedin_auth_kind(value: Any) -> str:
+    """Both auth payloads share provider, tell them apart by their credentials"""
+    if isinstance(value, dict):
+        return "cookie" if "access_token" in value else "basic"
+    return "cookie" if isinstance(value, LinkedInCookieAuth) else "basic"
+
+
+# Validated against the matching model only, instead of trying each in turn
+LinkedInAuthData = Annotated[
+    Union[
+        Annotated[LinkedInBasicAuth, Tag("basic")],
+        Annotated[LinkedInCookieAuth, Tag("cookie")],
+    ],
+    Discriminator(_linkedin_auth_kind),
+]
+
+
 class LinkedInAuthResponse(BaseModel):
     """Response model after successful LinkedIn authentication"""
 
@@ -59,6 +85,14 @@ class LinkedInCheckpointResponse(BaseModel):
     checkpoint: Dict[str, Any]
 
 
+class LinkedInPendingResponse(BaseModel):
+    """Response model while LinkedIn authentication runs in the background"""
+
+    object: str = "AccountPending"
+    account_id: str
+    status: str = "PENDING"
+
+
 class LinkedInAccountResponse(BaseModel):
     """Model for LinkedIn account information"""
 
@@ -80,6 +114,102 @@ class LinkedInCheckpointSolveRequest(BaseModel):
     code: str
 
 
+# Challenge URL path patterns, checked in order against the lowercased path
+_CHALLENGE_PATH_PATTERNS = [
+    # Direct login submit is typically an OTP challenge sent to email
+    (["/checkpoint/lg/direct-login-submit"], "OTP"),
+    # Phone verification patterns
+    (
+        [
+            "/checkpoint/lg/phone-challenge",
+            "/checkpoint/phone",
+            "/phone-register",
+            "/add-phone",
+            "/checkpoint/lg/add-phone-number",
+        ],
+        "PHONE_REGISTER",
+    ),
+    # Two-factor authentication patterns
+    (
+        [
+            "/two-step-verification",
+            "/checkpoint/lg/login-two-factor",
+            "/checkpoint/lg/two-factor-auth",
+            "/uas/two-factor-auth-checkpoint",
+        ],
+        "2FA",
+    ),
+    # CAPTCHA patterns
+    (
+        [
+            "/captcha",
+            "/checkpoint/challenge/captcha",
+            "/checkpoint/lg/captcha-challenge",
+            "/uas/captcha-submit",
+        ],
+        "CAPTCHA",
+    ),
+    # In-app validation patterns
+    (
+        [
+            "/checkpoint/lg/login-in-app",
+            "/mobile-app",
+            "/checkpoint/lg/app-challenge",
+            "/checkpoint/lg/mobile-validation",
+        ],
+        "IN_APP_VALIDATION",
+    ),
+    # Email verification patterns (different from OTP)
+    (
+        [
+            "/checkpoint/lg/email-pin-challenge",
+            "/checkpoint/lg/verify-email",
+            "/email-verification",
+        ],
+        "EMAIL_VERIFICATION",
+    ),
+    # Security verification patterns
+    (
+        [
+            "/checkpoint/lg/login-submit",
+            "/checkpoint/lg/security-challenge",
+            "/checkpoint/challenge/verify",
+        ],
+        "SECURITY_VERIFICATION",
+    ),
+    # Rate limiting or suspicious activity
+    (
+        [
+            "/checkpoint/lg/rate-limit",
+            "/checkpoint/lg/suspicious-activity",
+        ],
+        "RATE_LIMIT",
+    ),
+]
+
+_CHALLENGE_PATTERNS = [
+    (re.compile("|".join(re.escape(pattern) for pattern in patterns)), challenge_type)
+    for patterns, challenge_type in _CHALLENGE_PATH_PATTERNS
+]
+
+
+def _classify_challenge_path(path: str) -> str | None:
+    """Return the challenge type of the first pattern found in the path"""
+    for pattern, challenge_type in _CHALLENGE_PATTERNS:
+        if pattern.search(path):
+            return challenge_type
+    return None
+
+
+# LinkedIn redirects to the known checkpoint paths verbatim, so those are
+# resolved with a single dict lookup before falling back to the pattern scan
+_CHALLENGE_PATHS = {
+    path: _classify_challenge_path(path)
+    for patterns, _ in _CHALLENGE_PATH_PATTERNS
+    for path in patterns
+}
+
+
 class LinkedInClient:
     """Client class for LinkedIn API authentication"""
 
@@ -94,24 +224,53 @@ class LinkedInClient:
         "x-restli-protocol-version": "2.0.0",
     }
 
-    def __init__(self, debug=False, proxies=None):
-        self.session = requests.session()
-        self.session.headers.update(self.REQUEST_HEADERS)
-        self.session.verify = not debug
-
+    def __init__(
+        self,
+        debug: bool = False,
+        proxies: dict[str, str] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        # A shared transport (see create_linkedin_transport) keeps TLS
+        # connections alive across clients, while each client keeps its own
+        # cookie jar so LinkedIn sessions never leak between accounts. httpx
+        # ignores the client's verify for a given transport, so TLS checks of
+        # a shared transport follow create_linkedin_transport's debug flag
+        self._owns_transport = transport is None
+
+        mounts = None
         if proxies:
-            self.session.proxies.update(proxies)
+            # Same {"http": url, "https": url} mapping requests used to accept
+            mounts = {
+                f"{scheme}://": httpx.AsyncHTTPTransport(proxy=proxy, verify=not debug)
+                for scheme, proxy in proxies.items()
+            }
+
+        self.client = httpx.AsyncClient(
+            headers=self.REQUEST_HEADERS,
+            verify=not debug,
+            follow_redirects=True,
+            transport=transport,
+            mounts=mounts,
+        )
 
         self.logger = logger
 
-    def _request_session_cookies(self):
+    async def __aenter__(self) -> "LinkedInClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        # Closing the client closes its transport, leave shared ones open
+        if self._owns_transport:
+            await self.client.aclose()
+
+    async def _request_session_cookies(self) -> httpx.Cookies:
         """Get initial session cookies from LinkedIn"""
-        res = requests.get(
-            f"{self.AUTH_BASE_URL}/uas/authenticate", headers=self.REQUEST_HEADERS
-        )
+        res = await self.client.get(f"{self.AUTH_BASE_URL}/uas/authenticate")
         return res.cookies
 
-    def _determine_challenge_type(self, challenge_url, response_data=None):
+    def _determine_challenge_type(
+        self, challenge_url: str, response_data: dict[str, Any] | None = None
+    ) -> str:
         """
         Determine the type of LinkedIn challenge based on URL patterns and response data
 
@@ -123,8 +282,6 @@ class LinkedInClient:
             str: The challenge type (OTP, PHONE_REGISTER, CAPTCHA, IN_APP_VALIDATION, 2FA, etc.)
         """
         # Parse the URL to extract path and parameters
-        from urllib.parse import urlparse, parse_qs
-
         parsed_url = urlparse(challenge_url)
         path = parsed_url.path.lower()
         query_params = parse_qs(parsed_url.query)
@@ -133,98 +290,17 @@ class LinkedInClient:
         self.logger.debug(f"Challenge URL path: {path}")
         self.logger.debug(f"Challenge URL params: {query_params}")
 
-        # Check for specific patterns in the URL path
-
-        # Direct login submit usually indicates OTP or email verification
-        if "/checkpoint/lg/direct-login-submit" in path:
-            # This is typically an OTP challenge sent to email
-            return "OTP"
-
-        # Phone verification patterns
-        if any(
-            pattern in path
-            for pattern in [
-                "/checkpoint/lg/phone-challenge",
-                "/checkpoint/phone",
-                "/phone-register",
-                "/add-phone",
-                "/checkpoint/lg/add-phone-number",
-            ]
-        ):
-            return "PHONE_REGISTER"
-
-        # Two-factor authentication patterns
-        if any(
-            pattern in path
-            for pattern in [
-                "/two-step-verification",
-                "/checkpoint/lg/login-two-factor",
-                "/checkpoint/lg/two-factor-auth",
-                "/uas/two-factor-auth-checkpoint",
-            ]
-        ):
-            return "2FA"
-
-        # CAPTCHA patterns
-        if any(
-            pattern in path
-            for pattern in [
-                "/captcha",
-                "/checkpoint/challenge/captcha",
-                "/checkpoint/lg/captcha-challenge",
-                "/uas/captcha-submit",
-            ]
-        ):
-            return "CAPTCHA"
-
-        # In-app validation patterns
-        if any(
-            pattern in path
-            for pattern in [
-                "/checkpoint/lg/login-in-app",
-                "/mobile-app",
-                "/checkpoint/lg/app-challenge",
-                "/checkpoint/lg/mobile-validation",
-            ]
-        ):
-            return "IN_APP_VALIDATION"
-
-        # Email verification patterns (different from OTP)
-        if any(
-            pattern in path
-            for pattern in [
-                "/checkpoint/lg/email-pin-challenge",
-                "/checkpoint/lg/verify-email",
-                "/email-verification",
-            ]
-        ):
-            return "EMAIL_VERIFICATION"
-
-        # Security verification patterns
-        if any(
-            pattern in path
-            for pattern in [
-                "/checkpoint/lg/login-submit",
-                "/checkpoint/lg/security-challenge",
-                "/checkpoint/challenge/verify",
-            ]
-        ):
-            # Could be various types, need to check other indicators
-            # Check query parameters for more hints
-            if "addDetailedLoginResult" in query_params:
-                # This often indicates OTP
+        # Check for specific patterns in the URL path, first match wins
+        challenge_type = _CHALLENGE_PATHS.get(path) or _classify_challenge_path(path)
+        if challenge_type:
+            # Security checkpoints could be various types, the query
+            # parameters often indicate an OTP
+            if (
+                challenge_type == "SECURITY_VERIFICATION"
+                and "addDetailedLoginResult" in query_params
+            ):
                 return "OTP"
-            return "SECURITY_VERIFICATION"
-
-        # Rate limiting or suspicious activity
-        if any(
-            pattern in path
-            for pattern in [
-                "/checkpoint/lg/rate-limit",
-                "/checkpoint/lg/suspicious-activity",
-            ]
-        ):
-            return "RATE_LIMIT"
+            return challenge_type
 
         # If we can't determine from URL, check response data if available
         if response_data:
@@ -246,19 +322,23 @@ class LinkedInClient:
         )
         return "UNKNOWN"
 
-    def authenticate_with_credentials(self, username, password):
+    async def authenticate_with_credentials(
+        self, username: str, password: str
+    ) -> dict[str, Any]:
         """Authenticate with LinkedIn using username and password"""
-        cookies = self._request_session_cookies()
-        self.session.cookies = cookies
+        # The session cookies from this request are kept in the client's jar
+        await self._request_session_cookies()
 
         payload = {
             "session_key": username,
             "session_password": password,
-            "JSESSIONID": self.session.cookies.get("JSESSIONID", ""),
+            "JSESSIONID": self.client.cookies.get("JSESSIONID", ""),
         }
 
         # Authenticate
-        res = self.session.post(f"{self.AUTH_BASE_URL}/uas/authenticate", data=payload)
+        res = await self.client.post(
+            f"{self.AUTH_BASE_URL}/uas/authenticate", data=payload
+        )
 
         # Check response
         if res.status_code != 200:
@@ -311,7 +391,7 @@ class LinkedInClient:
             )
 
         # Extract the li_at cookie which is the access token
-        li_at = self.session.cookies.get("li_at", "")
+        li_at = self.client.cookies.get("li_at", "")
         if not li_at:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -321,19 +401,19 @@ class LinkedInClient:
         # Return the access token
         return {
             "access_token": li_at,
-            "premium_token": self.session.cookies.get("li_a", ""),
+            "premium_token": self.client.cookies.get("li_a", ""),
         }
 
-    def authenticate_with_cookies(self, access_token, premium_token=None):
+    async def authenticate_with_cookies(self, access_token, premium_token=None):
         """Authenticate with LinkedIn using cookies"""
         # Set cookies
-        self.session.cookies.set("li_at", access_token, domain=".linkedin.com")
+        self.client.cookies.set("li_at", access_token, domain=".linkedin.com")
 
         if premium_token:
-            self.session.cookies.set("li_a", premium_token, domain=".linkedin.com")
+            self.client.cookies.set("li_a", premium_token, domain=".linkedin.com")
 
         # Verify authentication by making a test API call
-        res = self.session.get(f"{self.BASE_URL}/me")
+        res = await self.client.get(f"{self.BASE_URL}/me")
 
         if res.status_code != 200:
             logger.error(
@@ -347,55 +427,76 @@ class LinkedInClient:
         return True
 
 
+def create_linkedin_transport(debug: bool = False) -> httpx.AsyncHTTPTransport:
+    """Create the process-wide connection pool used for LinkedIn requests"""
+    return httpx.AsyncHTTPTransport(
+        verify=not debug, limits=httpx.Limits(max_keepalive_connections=50)
+    )
+
+
+async def get_linkedin_client(request: Request) -> AsyncIterator[LinkedInClient]:
+    async with LinkedInClient(transport=request.app.state.linkedin_transport) as client:
+        yield client
+
+
+LinkedInClientDep = Annotated[LinkedInClient, Depends(get_linkedin_client)]
+
+
 @router.post(
     "/accounts",
-    response_model=Union[LinkedInAuthResponse, LinkedInCheckpointResponse],
+    response_model=Union[
+        LinkedInAuthResponse, LinkedInCheckpointResponse, LinkedInPendingResponse
+    ],
     status_code=status.HTTP_201_CREATED,
 )
 async def connect_linkedin_account(
-    auth_data: Union[LinkedInBasicAuth, LinkedInCookieAuth],
+    auth_data: Annotated[LinkedInAuthData, Body()],
     current_user: CurrentUser,
     session: SessionDep,
+    client: LinkedInClientDep,
+    response: Response,
 ):
-    """Connect a LinkedIn account using either username/password or cookies"""
-    client = LinkedInClient()
-
-    auth_result = {}
+    """
+    Connect a LinkedIn account using either username/password or cookies.
 
+    Username/password logins take several round-trips to LinkedIn, so they
+    are handed to the worker and answered with 202 right away. Poll
+    GET /accounts/{account_id} for the outcome.
+    """
     if isinstance(auth_data, LinkedInBasicAuth):
-        # Username/password authentication
-        auth_result = client.authenticate_with_credentials(
-            auth_data.username, auth_data.password
+        account_id = str(uuid7())
+        owner_id = str(current_user.id)
+
+        await set_linkedin_auth_state(
+            account_id, {"owner_id": owner_id, "status": "PENDING"}
+        )
+        # Job arguments are pickled into Redis, so the credentials are only
+        # stored encrypted, and the job expires along with its state
+        credentials = encrypt_secret(
+            orjson.dumps(
+                {"username": auth_data.username, "password": auth_data.password}
+            ).decode()
+        )
+        await get_arq_redis().enqueue_job(
+            "linkedin_auth",
+            account_id,
+            owner_id,
+            credentials,
+            _job_id=account_id,
+            _expires=settings.LINKEDIN_AUTH_STATE_TTL_SECONDS,
         )
-        # Check if authentication resulted in a challenge
-        if auth_result and auth_result.get("status") == "CHALLENGE":
-            account_id = str(uuid.uuid4())
-
-            # Return a checkpoint response with status code 202
-            return JSONResponse(
-                status_code=status.HTTP_202_ACCEPTED,
-                content=LinkedInCheckpointResponse(
-                    object="Checkpoint",
-                    account_id=account_id,
-                    checkpoint={
-                        "type": auth_result.get("challenge_type", "UNKNOWN"),
-                        "url": auth_result.get("challenge_url", ""),
-                    },
-                ).dict(),
-            )
 
-    elif isinstance(auth_data, LinkedInCookieAuth):
+        response.status_code = status.HTTP_202_ACCEPTED
+        return LinkedInPendingResponse(account_id=account_id)
+
+    if isinstance(auth_data, LinkedInCookieAuth):
         # Cookie authentication
-        client.authenticate_with_cookies(
+        await client.authenticate_with_cookies(
             auth_data.access_token, auth_data.premium_token
         )
-        auth_result = {
-            "access_token": auth_data.access_token,
-            "premium_token": auth_data.premium_token,
-        }
 
     # If we reached here, authentication was successful
-    account_id = str(uuid.uuid4())
+    account_id = str(uuid7())
 
     return LinkedInAuthResponse(object="AccountCreated", account_id=account_id)
 
@@ -409,6 +510,7 @@ async def solve_linkedin_checkpoint(
     checkpoint_data: LinkedInCheckpointSolveRequest,
     current_user: CurrentUser,
     session: SessionDep,
+    response: Response,
 ):
     """Solve a LinkedIn authentication challenge (2FA, OTP, etc.)"""
     # In a real implementation, you would:
@@ -419,36 +521,65 @@ async def solve_linkedin_checkpoint(
     # For demo purposes, we'll simulate a successful verification after a brief delay
     # This would normally interact with LinkedIn's verification endpoints
 
-    # Simulate processing time
-    time.sleep(0.5)
+    # Simulate processing time without blocking the event loop
+    await asyncio.sleep(0.5)
 
     # 10% chance of returning another challenge (for demo purposes)
     import random
 
     if random.random() < 0.1:
-        return JSONResponse(
-            status_code=status.HTTP_202_ACCEPTED,
-            content=LinkedInCheckpointResponse(
-                object="Checkpoint",
-                account_id=checkpoint_data.account_id,
-                checkpoint={
-                    "type": "OTP",  # A different challenge
-                    "message": "Please enter the OTP sent to your email",
-                },
-            ).dict(),
+        response.status_code = status.HTTP_202_ACCEPTED
+        return LinkedInCheckpointResponse(
+            object="Checkpoint",
+            account_id=checkpoint_data.account_id,
+            checkpoint={
+                "type": "OTP",  # A different challenge
+                "message": "Please enter the OTP sent to your email",
+            },
         )
 
     # 90% chance of successful verification
+    auth_state = await get_linkedin_auth_state(checkpoint_data.account_id)
+    if auth_state is not None and auth_state["owner_id"] == str(current_user.id):
+        await set_linkedin_auth_state(
+            checkpoint_data.account_id, {**auth_state, "status": "OK"}
+        )
+
     return LinkedInAuthResponse(
         object="AccountCreated", account_id=checkpoint_data.account_id
     )
 
 
-@router.get("/accounts/{account_id}", response_model=LinkedInAccountResponse)
+@router.get(
+    "/accounts/{account_id}",
+    response_model=Union[
+        LinkedInAccountResponse, LinkedInCheckpointResponse, LinkedInPendingResponse
+    ],
+)
 async def get_linkedin_account(
-    account_id: str, current_user: CurrentUser, session: SessionDep
+    account_id: str, current_user: CurrentUser, session: SessionDep, response: Response
 ):
     """Retrieve a LinkedIn account by its ID"""
+    # Credential logins report their progress until the worker is done
+    auth_state = await get_linkedin_auth_state(account_id)
+    if auth_state is not None:
+        if auth_state["owner_id"] != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Account not found"
+            )
+        if auth_state["status"] == "PENDING":
+            response.status_code = status.HTTP_202_ACCEPTED
+            return LinkedInPendingResponse(account_id=account_id)
+        if auth_state["status"] == "CHALLENGE":
+            response.status_code = status.HTTP_202_ACCEPTED
+            return LinkedInCheckpointResponse(
+                account_id=account_id, checkpoint=auth_state["checkpoint"]
+            )
+        if auth_state["status"] == "FAILED":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail=auth_state["detail"]
+            )
+
     # In a real implementation, you would:
     # 1. Fetch the account from the database
     # 2. Verify that it belongs to the current user
@@ -460,7 +591,7 @@ async def get_linkedin_account(
         type="LINKEDIN",
         id=account_id,
         name=f"LinkedIn Account for {current_user.email}",
-        created_at=datetime.utcnow(),
+        created_at=now(),
         connection_params={
             "linkedin": {
                 "username": "user@example.com"  # Would be fetched from DB in real implementation
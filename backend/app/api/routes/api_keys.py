@@ -1,17 +1,24 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
+from sqlmodel import func, select
 
 from app.models import (
+    API_KEYS_PUBLIC_ADAPTER,
     ApiKey, 
     ApiKeyCreate, 
     ApiKeyPublic, 
     ApiKeyResponse, 
     ApiKeysPublic,
-    ScopeType
+    ScopeType,
+    scopes_from_mask,
+    scopes_to_mask,
 )
 from app.api.deps.auth import CurrentUser, SessionDep
+from app.core.cache import invalidate_api_key_cache
+from app.core.clock import now
 from app.core.config import settings
 
 router = APIRouter(prefix="/api-keys", tags=["api-keys"])
@@ -34,26 +41,26 @@ async def create_api_key(
     key, key_prefix, hashed_key = ApiKey.generate_key()
     
     # Calculate expiry date
-    expires_at = datetime.utcnow() + timedelta(days=api_key_data.expiry_days)
+    expires_at = now() + timedelta(days=api_key_data.expiry_days)
     
     # Create API key object
     db_api_key = ApiKey(
         name=api_key_data.name,
-        key=key,  # Note: In a production system, you wouldn't store the raw key
         key_prefix=key_prefix,
         hashed_key=hashed_key,
         owner_id=current_user.id,
-        scopes=api_key_data.scopes,
+        scopes_mask=scopes_to_mask(api_key_data.scopes),
         expires_at=expires_at,
-        created_at=datetime.utcnow(),
+        created_at=now(),
     )
-    session.add(db_api_key)
-    session.commit()
-    session.refresh(db_api_key)
+    # INSERT ... RETURNING hands back the stored row in the same round-trip,
+    # instead of a refresh SELECT after the commit
+    statement = insert(ApiKey).values(**db_api_key.model_dump()).returning(ApiKey)
+    db_api_key = session.exec(statement).scalar_one()  # type: ignore
     
     # Return the full API key in the response
     # This is the only time the full key will be shown
-    return ApiKeyResponse(
+    api_key_response = ApiKeyResponse(
         id=db_api_key.id,
         name=db_api_key.name,
         key=key,  # Include the actual key in the response
@@ -62,6 +69,10 @@ async def create_api_key(
         created_at=db_api_key.created_at,
         expires_at=db_api_key.expires_at,
     )
+    # Built before the commit, which would expire the returned row
+    session.commit()
+    
+    return api_key_response
 
 
 @router.get("", response_model=ApiKeysPublic)
@@ -81,52 +92,71 @@ async def list_api_keys(
     - **show_expired**: Include expired keys in results
     - **show_revoked**: Include revoked keys in results
     """
-    query = select(ApiKey).where(ApiKey.owner_id == current_user.id)
-    
+    current_time = now()
+    not_expired = (ApiKey.expires_at > current_time) | (ApiKey.expires_at.is_(None))
+
+    conditions = [ApiKey.owner_id == current_user.id]
+
     # Filter out expired keys unless explicitly requested
     if not show_expired:
-        query = query.where(
-            (ApiKey.expires_at > datetime.utcnow()) | (ApiKey.expires_at.is_(None))
-        )
+        conditions.append(not_expired)
     
     # Filter out revoked keys unless explicitly requested
     if not show_revoked:
-        query = query.where(ApiKey.revoked == False)
+        conditions.append(ApiKey.revoked == False)
+
+    # Only the public columns are selected, so no ORM objects are built.
+    # COUNT(*) OVER () returns the unpaginated total alongside every row, and
+    # the effective active flag is computed by the database. SQLModel only
+    # types select() for up to four columns
+    query = select(  # type: ignore[call-overload]
+        ApiKey.id,
+        ApiKey.name,
+        ApiKey.key_prefix,
+        ApiKey.scopes_mask,
+        ApiKey.created_at,
+        ApiKey.expires_at,
+        (ApiKey.is_active & ~ApiKey.revoked & not_expired).label("is_active"),
+        ApiKey.last_used_at,
+        func.count().over().label("total"),
+    ).where(*conditions)
     
     # Apply pagination
     query = query.offset(skip).limit(limit)
     
     # Execute query
-    api_keys = session.exec(query).all()
-    
-    # Count total (without pagination)
-    from sqlalchemy import func
-    count_query = select(func.count()).select_from(ApiKey).where(ApiKey.owner_id == current_user.id)
-    if not show_expired:
-        count_query = count_query.where(
-            (ApiKey.expires_at > datetime.utcnow()) | (ApiKey.expires_at.is_(None))
-        )
-    if not show_revoked:
-        count_query = count_query.where(ApiKey.revoked == False)
-    
-    total_count = session.exec(count_query).one()
-    
-    # Transform to public view
+    rows = session.exec(query).all()
+    if rows:
+        total_count = rows[0].total
+    elif skip:
+        # Past the last page no row carries the total, count it separately
+        count_query = select(func.count()).select_from(ApiKey).where(*conditions)
+        total_count = session.exec(count_query).one()
+    else:
+        total_count = 0
+    
+    # Transform to public view, the rows come from the database so
+    # validation is skipped
     public_keys = [
-        ApiKeyPublic(
-            id=key.id,
-            name=key.name,
-            key_prefix=key.key_prefix,
-            scopes=key.scopes,  # Directly use the scopes list
-            created_at=key.created_at,
-            expires_at=key.expires_at,
-            is_active=key.is_active and not key.revoked and (key.expires_at is None or key.expires_at > datetime.utcnow()),
-            last_used_at=key.last_used_at,
+        ApiKeyPublic.model_construct(
+            id=row.id,
+            name=row.name,
+            key_prefix=row.key_prefix,
+            scopes=scopes_from_mask(row.scopes_mask),
+            created_at=row.created_at,
+            expires_at=row.expires_at,
+            is_active=row.is_active,
+            last_used_at=row.last_used_at,
         )
-        for key in api_keys
+        for row in rows
     ]
     
-    return ApiKeysPublic(data=public_keys, count=total_count)
+    return ORJSONResponse(
+        {
+            "data": API_KEYS_PUBLIC_ADAPTER.dump_python(public_keys, mode="json"),
+            "count": total_count,
+        }
+    )
 
 
 @router.get("/{api_key_id}", response_model=ApiKeyPublic)
@@ -159,7 +189,7 @@ async def get_api_key(
         scopes=api_key.scopes,
         created_at=api_key.created_at,
         expires_at=api_key.expires_at,
-        is_active=api_key.is_active and not api_key.revoked and (api_key.expires_at is None or api_key.expires_at > datetime.utcnow()),
+        is_active=api_key.is_active and not api_key.revoked and (api_key.expires_at is None or api_key.expires_at > now()),
         last_used_at=api_key.last_used_at,
     )
 
@@ -188,11 +218,15 @@ async def revoke_api_key(
     
     # Revoke the key
     api_key.revoked = True
-    api_key.revoked_at = datetime.utcnow()
+    api_key.revoked_at = now()
     api_key.is_active = False
+    key_digest = api_key.hashed_key
     
     session.add(api_key)
     session.commit()
+
+    # Drop any cached validation so the key stops working immediately
+    await invalidate_api_key_cache(key_digest)
     
     # No content response
     return None
@@ -2,10 +2,20 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlmodel import func, select
 
 from app.api.deps.auth import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.models import (
+    ITEMS_PUBLIC_ADAPTER,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+    from_orm_fast,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -38,7 +48,10 @@ def read_items(
         )
         items = session.exec(statement).all()
 
-    return ItemsPublic(data=items, count=count)
+    data = [from_orm_fast(ItemPublic, item) for item in items]
+    return ORJSONResponse(
+        {"data": ITEMS_PUBLIC_ADAPTER.dump_python(data, mode="json"), "count": count}
+    )
 
 
 @router.get("/{id}", response_model=ItemPublic)
@@ -2,6 +2,7 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlmodel import col, delete, func, select
 
 from app import crud
@@ -13,6 +14,7 @@ from app.api.deps.auth import (
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models import (
+    USERS_PUBLIC_ADAPTER,
     Item,
     Message,
     UpdatePassword,
@@ -23,6 +25,7 @@ from app.models import (
     UsersPublic,
     UserUpdate,
     UserUpdateMe,
+    from_orm_fast,
 )
 from app.utils import generate_new_account_email, send_email
 
@@ -45,7 +48,10 @@ def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
     statement = select(User).offset(skip).limit(limit)
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    data = [from_orm_fast(UserPublic, user) for user in users]
+    return ORJSONResponse(
+        {"data": USERS_PUBLIC_ADAPTER.dump_python(data, mode="json"), "count": count}
+    )
 
 
 @router.post(
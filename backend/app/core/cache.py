@@ -0,0 +1,141 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Any
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Versioned, bump it whenever the cached ApiKey fields change so entries in
+# the old shape are never read back
+API_KEY_CACHE_PREFIX = "apikey:v2:"
+API_KEY_LAST_USED_KEY = "apikey:lastused"
+API_KEY_REVOKED_PREFIX = "apikey:revoked:"
+
+# Read and clear the buffered timestamps in one atomic step, so hits recorded
+# while a flush is running land in the next batch instead of being lost
+_POP_HASH_SCRIPT = """
+local entries = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return entries
+"""
+
+# Cache a validated key unless it was invalidated meanwhile. A lookup that
+# read the row just before a revoke commits would otherwise write the stale
+# entry back after the revoke deleted it
+_SET_UNLESS_REVOKED_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+# Created by the application lifespan (and the worker startup), so the
+# connection pool belongs to the event loop that uses it
+_redis_client: Redis | None = None
+
+
+def init_redis() -> None:
+    global _redis_client
+    _redis_client = Redis.from_url(settings.REDIS_URL)
+
+
+async def close_redis() -> None:
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+
+
+def get_redis() -> Redis:
+    if _redis_client is None:
+        # A RedisError, so the cache helpers degrade as if Redis was down
+        raise RedisConnectionError("Redis client is not initialised")
+    return _redis_client
+
+
+def _api_key_cache_key(key_digest: str) -> str:
+    return f"{API_KEY_CACHE_PREFIX}{key_digest}"
+
+
+def _api_key_revoked_key(key_digest: str) -> str:
+    return f"{API_KEY_REVOKED_PREFIX}{key_digest}"
+
+
+# The cache is an optimisation only: every helper swallows Redis errors so an
+# unavailable Redis degrades to a database lookup instead of failing requests.
+
+
+async def get_api_key_cache(key_digest: str) -> dict[str, Any] | None:
+    try:
+        raw = await get_redis().get(_api_key_cache_key(key_digest))
+    except RedisError as e:
+        logger.warning(f"API key cache read failed: {e}")
+        return None
+    if raw is None:
+        return None
+    payload: dict[str, Any] = orjson.loads(raw)
+    return payload
+
+
+async def set_api_key_cache(key_digest: str, payload: dict[str, Any]) -> None:
+    """Cache a validated key, skipped while the key has a revoked tombstone."""
+    try:
+        set_unless_revoked = get_redis().register_script(_SET_UNLESS_REVOKED_SCRIPT)
+        await set_unless_revoked(
+            keys=[_api_key_cache_key(key_digest), _api_key_revoked_key(key_digest)],
+            args=[orjson.dumps(payload), settings.API_KEY_CACHE_TTL_SECONDS],
+        )
+    except RedisError as e:
+        logger.warning(f"API key cache write failed: {e}")
+
+
+async def invalidate_api_key_cache(key_digest: str) -> None:
+    """
+    Drop the cached entry and leave a tombstone for one cache TTL, so a
+    lookup still in flight cannot cache the key again.
+    """
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.set(
+                _api_key_revoked_key(key_digest),
+                1,
+                ex=settings.API_KEY_CACHE_TTL_SECONDS,
+            )
+            pipe.delete(_api_key_cache_key(key_digest))
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"API key cache invalidation failed: {e}")
+
+
+async def record_api_key_last_used(api_key_id: uuid.UUID, used_at: datetime) -> bool:
+    """Buffer a last-used timestamp, returns False if Redis is unavailable."""
+    try:
+        await get_redis().hset(  # type: ignore[misc]
+            API_KEY_LAST_USED_KEY, str(api_key_id), used_at.isoformat()
+        )
+    except RedisError as e:
+        logger.warning(f"API key last-used buffering failed: {e}")
+        return False
+    return True
+
+
+async def pop_api_key_last_used() -> dict[uuid.UUID, datetime]:
+    """Take the buffered timestamps, empty if Redis is unavailable."""
+    try:
+        pop_hash = get_redis().register_script(_POP_HASH_SCRIPT)
+        entries = await pop_hash(keys=[API_KEY_LAST_USED_KEY])
+    except RedisError as e:
+        logger.warning(f"API key last-used flush failed: {e}")
+        return {}
+    return {
+        uuid.UUID(entries[i].decode()): datetime.fromisoformat(entries[i + 1].decode())
+        for i in range(0, len(entries), 2)
+    }
@@ -0,0 +1,44 @@
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Set once per request by RequestNowMiddleware
+_now_var: ContextVar[datetime | None] = ContextVar("now", default=None)
+
+
+def set_request_now() -> Token[datetime | None]:
+    """Pin the current UTC time for the rest of the request."""
+    return _now_var.set(datetime.now(timezone.utc))
+
+
+def reset_request_now(token: Token[datetime | None]) -> None:
+    _now_var.reset(token)
+
+
+def now() -> datetime:
+    """
+    Current UTC time. Inside a request this is the same value for every
+    call, outside of one (background tasks, scripts) it is read fresh.
+    """
+    return _now_var.get() or datetime.now(timezone.utc)
+
+
+class RequestNowMiddleware:
+    """
+    Pure ASGI middleware pinning now() for each HTTP request, one clock read
+    per request shared by every now() call while handling it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = set_request_now()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_request_now(token)
@@ -69,6 +69,22 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    REDIS_SERVER: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def REDIS_URL(self) -> str:
+        return f"redis://{self.REDIS_SERVER}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
+    # Seconds a validated API key is served from Redis before re-reading the DB
+    API_KEY_CACHE_TTL_SECONDS: int = 60
+    # Seconds between flushes of buffered API key last_used_at timestamps
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 5
+    # Seconds the outcome of a background LinkedIn login is kept for polling
+    LINKEDIN_AUTH_STATE_TTL_SECONDS: int = 3600
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
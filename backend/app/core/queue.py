@@ -0,0 +1,45 @@
+from typing import Any
+
+import orjson
+from arq.connections import ArqRedis, RedisSettings
+
+from app.core.cache import get_redis
+from app.core.config import settings
+
+redis_settings = RedisSettings(
+    host=settings.REDIS_SERVER,
+    port=settings.REDIS_PORT,
+    database=settings.REDIS_DB,
+)
+
+
+def get_arq_redis() -> ArqRedis:
+    """Job queue client, jobs are enqueued over the cache's connection pool"""
+    return ArqRedis(connection_pool=get_redis().connection_pool)
+
+
+LINKEDIN_AUTH_STATE_PREFIX = "linkedin:auth:"
+
+
+def _linkedin_auth_state_key(account_id: str) -> str:
+    return f"{LINKEDIN_AUTH_STATE_PREFIX}{account_id}"
+
+
+# Unlike the cache helpers these let Redis errors propagate, the state of a
+# background login is only stored in Redis.
+
+
+async def set_linkedin_auth_state(account_id: str, state: dict[str, Any]) -> None:
+    await get_redis().set(
+        _linkedin_auth_state_key(account_id),
+        orjson.dumps(state),
+        ex=settings.LINKEDIN_AUTH_STATE_TTL_SECONDS,
+    )
+
+
+async def get_linkedin_auth_state(account_id: str) -> dict[str, Any] | None:
+    raw = await get_redis().get(_linkedin_auth_state_key(account_id))
+    if raw is None:
+        return None
+    state: dict[str, Any] = orjson.loads(raw)
+    return state
@@ -1,7 +1,10 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import jwt
+from cryptography.fernet import Fernet
 from passlib.context import CryptContext
 
 from app.core.config import settings
@@ -11,6 +14,11 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# Symmetric key derived from SECRET_KEY, shared by the API and the worker
+_fernet = Fernet(
+    base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest())
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -25,3 +33,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def encrypt_secret(secret: str) -> str:
+    return _fernet.encrypt(secret.encode()).decode()
+
+
+def decrypt_secret(token: str, ttl: int | None = None) -> str:
+    """Raises cryptography.fernet.InvalidToken if tampered with or older than ttl"""
+    return _fernet.decrypt(token.encode(), ttl=ttl).decode()
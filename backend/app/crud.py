@@ -1,10 +1,12 @@
 import uuid
+from datetime import datetime
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import DateTime, Uuid, column, or_, update, values
+from sqlmodel import Session, col, select
 
 from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.models import ApiKey, Item, ItemCreate, User, UserCreate, UserUpdate
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -52,3 +54,31 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     session.commit()
     session.refresh(db_item)
     return db_item
+
+
+def update_api_keys_last_used(
+    *, session: Session, last_used: dict[uuid.UUID, datetime]
+) -> None:
+    if not last_used:
+        return
+    # Single UPDATE ... FROM (VALUES ...) for the whole batch. Batches can be
+    # flushed out of order (several workers, a retried flush), so only move
+    # last_used_at forward.
+    rows = values(
+        column("id", Uuid),
+        column("last_used_at", DateTime(timezone=True)),
+        name="last_used",
+    ).data(list(last_used.items()))
+    statement = (
+        update(ApiKey)
+        .where(ApiKey.id == rows.c.id)  # type: ignore
+        .where(
+            or_(
+                col(ApiKey.last_used_at).is_(None),
+                col(ApiKey.last_used_at) < rows.c.last_used_at,
+            )
+        )
+        .values(last_used_at=rows.c.last_used_at)
+    )
+    session.exec(statement)  # type: ignore
+    session.commit()
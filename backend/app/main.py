@@ -1,11 +1,23 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.deps.api_key_auth import flush_api_key_last_used
 from app.api.main import api_router
+from app.api.routes.account import create_linkedin_transport
+from app.core.cache import close_redis, init_redis
+from app.core.clock import RequestNowMiddleware
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
@@ -14,10 +26,42 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+async def flush_api_key_last_used_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.API_KEY_LAST_USED_FLUSH_SECONDS)
+        try:
+            await flush_api_key_last_used()
+        except Exception as e:
+            logger.error(f"Flushing API key last used timestamps failed: {e}")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(fastapi_app: FastAPI) -> AsyncIterator[None]:
+    # Shared LinkedIn connection pool, so TLS connections are reused
+    fastapi_app.state.linkedin_transport = create_linkedin_transport()
+    init_redis()
+    flush_task = asyncio.create_task(flush_api_key_last_used_periodically())
+    try:
+        yield
+    finally:
+        await fastapi_app.state.linkedin_transport.aclose()
+        flush_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flush_task
+        # Persist whatever was buffered since the last tick, before the
+        # client is closed
+        with contextlib.suppress(Exception):
+            await flush_api_key_last_used()
+        await close_redis()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -30,4 +74,7 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+app.add_middleware(RequestNowMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,16 +1,47 @@
 import uuid
 import secrets
-from datetime import datetime, timedelta
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from enum import Enum, auto
-from typing import List, Optional, Set
+from typing import Annotated, Any, List, Optional, Set, TypeVar
 
-from pydantic import EmailStr, validator
-from sqlmodel import Field, Relationship, SQLModel, Column, JSON
+from annotated_types import MaxLen
+from pydantic import ConfigDict, EmailStr, TypeAdapter
+from sqlalchemy import DateTime, Index, SmallInteger, text
+from sqlmodel import Field, Relationship, SQLModel
+from uuid_utils.compat import uuid7
+
+from app.core.security import hash_api_key
+
+
+class TZDateTime(DateTime):
+    """TIMESTAMP WITH TIME ZONE, a type class as Field(sa_type=...) expects"""
+
+    def __init__(self) -> None:
+        super().__init__(timezone=True)
+
+
+_ModelT = TypeVar("_ModelT", bound=SQLModel)
+
+
+def from_orm_fast(model: type[_ModelT], obj: Any) -> _ModelT:
+    """
+    Build a response model from a row read from our own database. The values
+    are already valid, so validation is skipped.
+    """
+    return model.model_construct(
+        **{name: getattr(obj, name) for name in model.model_fields}
+    )
+
+
+# Shared by every model that carries an email, so the constraint is declared once
+EmailStrMax255 = Annotated[EmailStr, MaxLen(255)]
 
 
 # Shared properties
 class UserBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True, max_length=255)
+    email: EmailStrMax255 = Field(unique=True, index=True)
     is_active: bool = True
     is_superuser: bool = False
     full_name: str | None = Field(default=None, max_length=255)
@@ -22,20 +53,20 @@ class UserCreate(UserBase):
 
 
 class UserRegister(SQLModel):
-    email: EmailStr = Field(max_length=255)
+    email: EmailStrMax255
     password: str = Field(min_length=8, max_length=40)
     full_name: str | None = Field(default=None, max_length=255)
 
 
 # Properties to receive via API on update, all are optional
 class UserUpdate(UserBase):
-    email: EmailStr | None = Field(default=None, max_length=255)  # type: ignore
+    email: EmailStrMax255 | None = None  # type: ignore
     password: str | None = Field(default=None, min_length=8, max_length=40)
 
 
 class UserUpdateMe(SQLModel):
     full_name: str | None = Field(default=None, max_length=255)
-    email: EmailStr | None = Field(default=None, max_length=255)
+    email: EmailStrMax255 | None = None
 
 
 class UpdatePassword(SQLModel):
@@ -45,7 +76,7 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
     hashed_password: str
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
     api_keys: list["ApiKey"] = Relationship(back_populates="owner", cascade_delete=True)
@@ -53,10 +84,14 @@ class User(UserBase, table=True):
 
 # Properties to return via API, id is always required
 class UserPublic(UserBase):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     id: uuid.UUID
 
 
 class UsersPublic(SQLModel):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     data: list[UserPublic]
     count: int
 
@@ -79,7 +114,7 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
@@ -88,22 +123,30 @@ class Item(ItemBase, table=True):
 
 # Properties to return via API, id is always required
 class ItemPublic(ItemBase):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     id: uuid.UUID
     owner_id: uuid.UUID
 
 
 class ItemsPublic(SQLModel):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     data: list[ItemPublic]
     count: int
 
 
 # Generic message
 class Message(SQLModel):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     message: str
 
 
 # JSON payload containing access token
 class Token(SQLModel):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     access_token: str
     token_type: str = "bearer"
 
@@ -128,51 +171,85 @@ class ScopeType(str, Enum):
     WEBHOOKS_WRITE = "webhooks:write"
 
 
+# Bit of each scope in ApiKey.scopes_mask, never reuse or renumber a bit
+SCOPE_BITS: dict[ScopeType, int] = {
+    ScopeType.ACCOUNTS_READ: 1,
+    ScopeType.ACCOUNTS_WRITE: 2,
+    ScopeType.WEBHOOKS_READ: 4,
+    ScopeType.WEBHOOKS_WRITE: 8,
+}
+
+
+def scopes_to_mask(scopes: Iterable[ScopeType]) -> int:
+    mask = 0
+    for scope in scopes:
+        mask |= SCOPE_BITS[scope]
+    return mask
+
+
+def scopes_from_mask(mask: int) -> list[ScopeType]:
+    return [scope for scope, bit in SCOPE_BITS.items() if mask & bit]
+
+
 class ApiKeyBase(SQLModel):
     """Base model for API key"""
     name: str = Field(index=True, max_length=100)
-    scopes: List[ScopeType] = Field(sa_column=Column(JSON))
-    expires_at: datetime | None = None
-    
-    @validator("scopes")
-    def validate_scopes(cls, v):
-        """Ensure scopes are valid"""
-        if not v:
-            raise ValueError("At least one scope must be provided")
-        
-        valid_scopes = set(item.value for item in ScopeType)
-        for scope in v:
-            if scope not in valid_scopes:
-                raise ValueError(f"Invalid scope: {scope}")
-        return v
+    expires_at: datetime | None = Field(default=None, sa_type=TZDateTime)
 
 
 class ApiKeyCreate(ApiKeyBase):
     """Model for creating a new API key"""
+    # Values are coerced to ScopeType and the non-empty check runs in pydantic-core
+    scopes: List[ScopeType] = Field(min_length=1)
     expiry_days: int = Field(ge=1, le=365, description="Number of days until key expires")
-    
-    @validator("expiry_days")
-    def validate_expiry_days(cls, v):
-        if v < 1 or v > 365:
-            raise ValueError("Expiry days must be between 1 and 365")
-        return v
 
 
 class ApiKey(ApiKeyBase, table=True):
     """Database model for API keys"""
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    key: str = Field(unique=True, index=True)
-    key_prefix: str = Field(max_length=8, index=True)  # Prefix for display/reference
-    hashed_key: str  # Stores hashed version of the key for security
+    # The migration sets fillfactor = 90 with ALTER TABLE, so pages written
+    # from then on keep free space and the frequent last_used_at updates can
+    # stay on the same page as HOT updates. Existing pages are not rewritten
+    # until the table is (VACUUM FULL, CLUSTER or pg_repack). SQLAlchemy has
+    # no table-level option for storage parameters
+    __table_args__ = (
+        # Serves the default "active keys of a user" listing
+        Index(
+            "ix_apikey_owner_active",
+            "owner_id",
+            "revoked",
+            "expires_at",
+            postgresql_where=text("revoked = false"),
+        ),
+        # Authentication lookup, the validity columns are carried in the index
+        Index(
+            "ix_apikey_auth",
+            "hashed_key",
+            unique=True,
+            postgresql_include=["is_active", "revoked", "expires_at"],
+        ),
+    )
+
+    # Time-ordered ids keep primary key inserts on the rightmost index page
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    key_prefix: str = Field(max_length=8)  # Prefix for display/reference
+    hashed_key: str  # SHA-256 of the key, used for lookup
+    scopes_mask: int = Field(sa_type=SmallInteger)  # Bitwise OR of SCOPE_BITS
     
     owner_id: uuid.UUID = Field(foreign_key="user.id")
     owner: User = Relationship(back_populates="api_keys")
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    last_used_at: datetime | None = None
+    created_at: datetime = Field(
+        default_factory=partial(datetime.now, timezone.utc),
+        sa_type=TZDateTime,
+    )
+    last_used_at: datetime | None = Field(default=None, sa_type=TZDateTime)
     is_active: bool = True
     revoked: bool = False
-    revoked_at: datetime | None = None
+    revoked_at: datetime | None = Field(default=None, sa_type=TZDateTime)
+    
+    @property
+    def scopes(self) -> list[ScopeType]:
+        return scopes_from_mask(self.scopes_mask)
     
     @classmethod
     def generate_key(cls) -> tuple[str, str, str]:
@@ -183,9 +260,8 @@ class ApiKey(ApiKeyBase, table=True):
         # Create a prefix for reference (first 8 chars)
         key_prefix = key[:8]
         
-        # In a real app, you would hash this with a secure method
-        # For this example, we'll use a simple representation
-        hashed_key = f"hashed_{key}"
+        # Only the hash is stored, the key itself is shown once at creation
+        hashed_key = hash_api_key(key)
         
         return key, key_prefix, hashed_key
 
@@ -196,6 +272,8 @@ class ApiKey(ApiKeyBase, table=True):
 
 class ApiKeyPublic(SQLModel):
     """Public representation of an API key"""
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     id: uuid.UUID
     name: str
     key_prefix: str
@@ -208,6 +286,8 @@ class ApiKeyPublic(SQLModel):
 
 class ApiKeyResponse(SQLModel):
     """Response when creating a new API key"""
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     id: uuid.UUID
     name: str
     key: str  # Full key - only shown once at creation
@@ -219,5 +299,15 @@ class ApiKeyResponse(SQLModel):
 
 class ApiKeysPublic(SQLModel):
     """Response model for listing API keys"""
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment,unused-ignore]
+
     data: List[ApiKeyPublic]
     count: int
+
+
+# Serializers for the list endpoints, built once at import. The routes dump
+# their rows with these and return the JSON response directly, which skips
+# FastAPI's validate-then-serialize pass over the response_model
+USERS_PUBLIC_ADAPTER = TypeAdapter(list[UserPublic])
+ITEMS_PUBLIC_ADAPTER = TypeAdapter(list[ItemPublic])
+API_KEYS_PUBLIC_ADAPTER = TypeAdapter(list[ApiKeyPublic])
@@ -0,0 +1,208 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from redis.asyncio import Redis
+from sqlmodel import Session
+from starlette.requests import Request
+
+from app.api.deps.api_key_auth import (
+    flush_api_key_last_used,
+    get_api_key,
+    get_api_key_user,
+    require_accounts_read,
+    require_accounts_write,
+    require_api_key_with_scopes,
+)
+from app.core import cache
+from app.core.cache import get_api_key_cache, set_api_key_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import hash_api_key
+from app.models import ApiKey, ScopeType, scopes_to_mask
+from app.tests.utils.api_key import create_api_key
+from app.tests.utils.utils import call_in_app
+
+
+def authenticate(client: TestClient, key: str) -> ApiKey | None:
+    with Session(engine) as session:
+        request = Request({"type": "http", "headers": []})
+        return call_in_app(client, get_api_key, request, session, key)
+
+
+def test_get_api_key_cache_miss(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    key_digest = hash_api_key(created["key"])
+    assert call_in_app(client, get_api_key_cache, key_digest) is None
+
+    api_key = authenticate(client, created["key"])
+    assert api_key
+    assert str(api_key.id) == created["id"]
+    cached = call_in_app(client, get_api_key_cache, key_digest)
+    assert cached
+    assert cached["id"] == created["id"]
+
+
+def test_get_api_key_cache_hit(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    assert authenticate(client, created["key"])
+    # Renamed behind the cache's back, the cached entry is still served
+    db_api_key = db.get(ApiKey, uuid.UUID(created["id"]))
+    assert db_api_key
+    db_api_key.name = "Renamed"
+    db.add(db_api_key)
+    db.commit()
+
+    api_key = authenticate(client, created["key"])
+    assert api_key
+    assert api_key.name == created["name"]
+
+
+def test_get_api_key_user(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    # Joined with the key on the cache miss, then loaded by id on the hit
+    for _ in range(2):
+        with Session(engine) as session:
+            request = Request({"type": "http", "headers": []})
+            api_key = call_in_app(client, get_api_key, request, session, created["key"])
+            user = call_in_app(client, get_api_key_user, request, session, api_key)
+            assert user
+            assert user.email == settings.FIRST_SUPERUSER
+
+
+def test_get_api_key_unknown_key_not_cached(client: TestClient) -> None:
+    key = ApiKey.generate_key()[0]
+    assert authenticate(client, key) is None
+    assert call_in_app(client, get_api_key_cache, hash_api_key(key)) is None
+
+
+def test_get_api_key_rejects_invalid_cached_entry(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    key_digest = hash_api_key(created["key"])
+    assert authenticate(client, created["key"])
+    cached = call_in_app(client, get_api_key_cache, key_digest)
+    assert cached
+    call_in_app(client, set_api_key_cache, key_digest, {**cached, "revoked": True})
+
+    assert authenticate(client, created["key"]) is None
+
+
+def test_revoke_api_key_invalidates_cache(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    key_digest = hash_api_key(created["key"])
+    assert authenticate(client, created["key"])
+    assert call_in_app(client, get_api_key_cache, key_digest)
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/api-keys/{created['id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 204
+    assert call_in_app(client, get_api_key_cache, key_digest) is None
+    assert authenticate(client, created["key"]) is None
+
+
+def test_revoke_api_key_blocks_stale_cache_write(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    key_digest = hash_api_key(created["key"])
+    assert authenticate(client, created["key"])
+    stale = call_in_app(client, get_api_key_cache, key_digest)
+    assert stale
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/api-keys/{created['id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 204
+    # A lookup that read the row before the revoke committed writes it back
+    call_in_app(client, set_api_key_cache, key_digest, stale)
+
+    assert call_in_app(client, get_api_key_cache, key_digest) is None
+    assert authenticate(client, created["key"]) is None
+
+
+def test_flush_api_key_last_used(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = [create_api_key(client, superuser_token_headers) for _ in range(2)]
+    for api_key in created:
+        assert authenticate(client, api_key["key"])
+
+    # Both buffered timestamps are written by one flush
+    call_in_app(client, flush_api_key_last_used)
+
+    with Session(engine) as session:
+        for api_key in created:
+            db_api_key = session.get(ApiKey, uuid.UUID(api_key["id"]))
+            assert db_api_key
+            assert db_api_key.last_used_at is not None
+    assert call_in_app(client, cache.pop_api_key_last_used) == {}
+
+
+def test_get_api_key_redis_unavailable(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    # Nothing listens on port 1
+    unavailable = Redis.from_url("redis://localhost:1")
+    monkeypatch.setattr(cache, "_redis_client", unavailable)
+
+    assert authenticate(client, created["key"])
+    # Written directly instead of being buffered
+    with Session(engine) as session:
+        db_api_key = session.get(ApiKey, uuid.UUID(created["id"]))
+        assert db_api_key
+        assert db_api_key.last_used_at is not None
+    # Nothing to flush, and the failure is not raised
+    call_in_app(client, flush_api_key_last_used)
+    call_in_app(client, unavailable.aclose)
+
+
+def build_api_key(*scopes: ScopeType) -> ApiKey:
+    _, key_prefix, hashed_key = ApiKey.generate_key()
+    return ApiKey(
+        name="Scoped key",
+        key_prefix=key_prefix,
+        hashed_key=hashed_key,
+        scopes_mask=scopes_to_mask(scopes),
+        owner_id=uuid.uuid4(),
+    )
+
+
+def test_require_api_key_with_scopes_is_shared() -> None:
+    dependency = require_api_key_with_scopes(frozenset({ScopeType.ACCOUNTS_READ}))
+    assert dependency is require_accounts_read
+
+
+def test_require_scopes_allowed(client: TestClient) -> None:
+    api_key = build_api_key(ScopeType.ACCOUNTS_READ, ScopeType.ACCOUNTS_WRITE)
+    assert call_in_app(client, require_accounts_write, api_key) is api_key
+
+
+def test_require_scopes_missing_scope(client: TestClient) -> None:
+    api_key = build_api_key(ScopeType.ACCOUNTS_READ, ScopeType.WEBHOOKS_WRITE)
+    with pytest.raises(HTTPException) as exc_info:
+        call_in_app(client, require_accounts_write, api_key)
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == "API key missing required scope: accounts:write"
+
+
+def test_require_scopes_without_api_key(client: TestClient) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        call_in_app(client, require_accounts_read, None)
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,184 @@
+from typing import Any
+
+import pytest
+from arq.constants import default_queue_name, job_key_prefix
+from fastapi.testclient import TestClient
+
+from app.api.routes.account import LinkedInClient
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.queue import get_linkedin_auth_state, set_linkedin_auth_state
+from app.tests.utils.utils import call_in_app, random_lower_string
+
+
+@pytest.mark.parametrize(
+    ("challenge_url", "expected"),
+    [
+        ("https://www.linkedin.com/checkpoint/lg/direct-login-submit", "OTP"),
+        ("https://www.linkedin.com/checkpoint/lg/add-phone-number", "PHONE_REGISTER"),
+        ("https://www.linkedin.com/checkpoint/lg/login-two-factor", "2FA"),
+        ("https://www.linkedin.com/checkpoint/challenge/CAPTCHA", "CAPTCHA"),
+        ("https://www.linkedin.com/checkpoint/lg/login-in-app", "IN_APP_VALIDATION"),
+        ("https://www.linkedin.com/checkpoint/lg/verify-email", "EMAIL_VERIFICATION"),
+        (
+            "https://www.linkedin.com/checkpoint/lg/login-submit",
+            "SECURITY_VERIFICATION",
+        ),
+        (
+            "https://www.linkedin.com/checkpoint/lg/login-submit?addDetailedLoginResult=1",
+            "OTP",
+        ),
+        ("https://www.linkedin.com/checkpoint/lg/rate-limit", "RATE_LIMIT"),
+        # Not a known path, resolved by the pattern scan
+        ("https://www.linkedin.com/checkpoint/lg/captcha-challenge/v2", "CAPTCHA"),
+        ("https://www.linkedin.com/checkpoint/unknown", "UNKNOWN"),
+    ],
+)
+def test_determine_challenge_type(challenge_url: str, expected: str) -> None:
+    client = LinkedInClient()
+    assert client._determine_challenge_type(challenge_url) == expected
+
+
+def test_determine_challenge_type_from_response_data() -> None:
+    client = LinkedInClient()
+    challenge_url = "https://www.linkedin.com/checkpoint/unknown"
+    assert (
+        client._determine_challenge_type(challenge_url, {"phoneNumber": "+1"})
+        == "PHONE_REGISTER"
+    )
+
+
+@pytest.mark.parametrize(
+    ("data", "expected_loc"),
+    [
+        (
+            {"provider": "LINKEDIN", "access_token": 1},
+            ["body", "cookie", "access_token"],
+        ),
+        ({"provider": "LINKEDIN", "username": "user"}, ["body", "basic", "password"]),
+    ],
+)
+def test_connect_account_validates_matching_auth_model(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    data: dict[str, str],
+    expected_loc: list[str],
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/accounts",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [expected_loc]
+
+
+async def pop_queued_job(account_id: str) -> tuple[bytes | None, int]:
+    """Remove a queued login job, returning its stored payload and TTL"""
+    redis = get_redis()
+    job_key = f"{job_key_prefix}{account_id}"
+    payload = await redis.get(job_key)
+    ttl = await redis.ttl(job_key)
+    await redis.delete(job_key)
+    await redis.zrem(default_queue_name, account_id)
+    return payload, ttl
+
+
+def connect_with_credentials(
+    client: TestClient, headers: dict[str, str], username: str, password: str
+) -> str:
+    data = {"provider": "LINKEDIN", "username": username, "password": password}
+    response = client.post(
+        f"{settings.API_V1_STR}/accounts", headers=headers, json=data
+    )
+    assert response.status_code == 202
+    content = response.json()
+    assert content["object"] == "AccountPending"
+    assert content["status"] == "PENDING"
+    account_id: str = content["account_id"]
+    return account_id
+
+
+def test_connect_account_with_credentials_is_queued(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    username = f"{random_lower_string()}@example.com"
+    password = random_lower_string()
+    account_id = connect_with_credentials(
+        client, superuser_token_headers, username, password
+    )
+
+    payload, ttl = call_in_app(client, pop_queued_job, account_id)
+    assert payload
+    # Only the encrypted credentials are stored, and not beyond the auth state
+    assert username.encode() not in payload
+    assert password.encode() not in payload
+    assert 0 < ttl <= settings.LINKEDIN_AUTH_STATE_TTL_SECONDS
+
+
+def test_get_account_pending(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    account_id = connect_with_credentials(
+        client, superuser_token_headers, "user@example.com", random_lower_string()
+    )
+    call_in_app(client, pop_queued_job, account_id)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/accounts/{account_id}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 202
+    assert response.json() == {
+        "object": "AccountPending",
+        "account_id": account_id,
+        "status": "PENDING",
+    }
+    # Only the user who started the login can poll it
+    response = client.get(
+        f"{settings.API_V1_STR}/accounts/{account_id}",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    ("state", "status_code", "expected"),
+    [
+        (
+            {"status": "CHALLENGE", "checkpoint": {"type": "OTP", "url": ""}},
+            202,
+            {"object": "Checkpoint", "checkpoint": {"type": "OTP", "url": ""}},
+        ),
+        (
+            {"status": "FAILED", "detail": "Invalid credentials"},
+            401,
+            {"detail": "Invalid credentials"},
+        ),
+        ({"status": "OK"}, 200, {"object": "Account", "type": "LINKEDIN"}),
+    ],
+)
+def test_get_account_auth_outcome(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    state: dict[str, Any],
+    status_code: int,
+    expected: dict[str, Any],
+) -> None:
+    account_id = connect_with_credentials(
+        client, superuser_token_headers, "user@example.com", random_lower_string()
+    )
+    call_in_app(client, pop_queued_job, account_id)
+    # Recorded by the worker once the login finished
+    pending = call_in_app(client, get_linkedin_auth_state, account_id)
+    assert pending
+    call_in_app(client, set_linkedin_auth_state, account_id, {**pending, **state})
+
+    response = client.get(
+        f"{settings.API_V1_STR}/accounts/{account_id}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == status_code
+    assert response.json().items() >= expected.items()
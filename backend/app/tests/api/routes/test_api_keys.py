@@ -0,0 +1,161 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.security import hash_api_key
+from app.models import ApiKey
+from app.tests.utils.api_key import create_api_key
+
+
+def test_create_api_key(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    content = create_api_key(client, superuser_token_headers)
+    assert content["name"] == "Test key"
+    assert content["scopes"] == ["accounts:read"]
+    assert content["key_prefix"] == content["key"][:8]
+    api_key = db.get(ApiKey, uuid.UUID(content["id"]))
+    assert api_key
+    # Only the hash of the key is persisted
+    assert api_key.hashed_key == hash_api_key(content["key"])
+
+
+def test_create_api_key_without_scopes(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"name": "No scopes", "scopes": [], "expiry_days": 30}
+    response = client.post(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 422
+
+
+def test_create_api_key_invalid_scope(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"name": "Bad scope", "scopes": ["accounts:admin"], "expiry_days": 30}
+    response = client.post(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 422
+
+
+def test_read_api_keys(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    create_api_key(client, superuser_token_headers)
+    create_api_key(client, superuser_token_headers)
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] >= 2
+    assert len(content["data"]) == content["count"]
+    for api_key in content["data"]:
+        assert "key" not in api_key
+        assert api_key["is_active"] is True
+
+
+def test_read_api_keys_paginated_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    create_api_key(client, superuser_token_headers)
+    create_api_key(client, superuser_token_headers)
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+        params={"limit": 1},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["data"]) == 1
+    assert content["count"] >= 2
+
+
+def test_read_api_keys_count_past_last_page(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    create_api_key(client, superuser_token_headers)
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+    )
+    total = response.json()["count"]
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+        params={"skip": total},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["data"] == []
+    assert content["count"] == total
+
+
+def test_read_api_key(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys/{created['id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["id"] == created["id"]
+    assert content["key_prefix"] == created["key_prefix"]
+    assert "key" not in content
+
+
+def test_read_api_key_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys/{uuid.uuid4()}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "API key not found"
+
+
+def test_revoke_api_key(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    response = client.delete(
+        f"{settings.API_V1_STR}/api-keys/{created['id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 204
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+    )
+    ids = [api_key["id"] for api_key in response.json()["data"]]
+    assert created["id"] not in ids
+
+
+def test_read_api_keys_show_revoked(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    created = create_api_key(client, superuser_token_headers)
+    client.delete(
+        f"{settings.API_V1_STR}/api-keys/{created['id']}",
+        headers=superuser_token_headers,
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=superuser_token_headers,
+        params={"show_revoked": True},
+    )
+    assert response.status_code == 200
+    api_keys = {api_key["id"]: api_key for api_key in response.json()["data"]}
+    assert api_keys[created["id"]]["is_active"] is False
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from app import crud
+from app.tests.utils.api_key import create_random_api_key
+
+
+def test_update_api_keys_last_used(db: Session) -> None:
+    api_key_1 = create_random_api_key(db)
+    api_key_2 = create_random_api_key(db)
+    untouched = create_random_api_key(db)
+    used_at_1 = datetime.now(timezone.utc)
+    used_at_2 = used_at_1 - timedelta(minutes=1)
+
+    crud.update_api_keys_last_used(
+        session=db, last_used={api_key_1.id: used_at_1, api_key_2.id: used_at_2}
+    )
+
+    for api_key in (api_key_1, api_key_2, untouched):
+        db.refresh(api_key)
+    assert api_key_1.last_used_at == used_at_1
+    assert api_key_2.last_used_at == used_at_2
+    assert untouched.last_used_at is None
+
+
+def test_update_api_keys_last_used_keeps_newer(db: Session) -> None:
+    api_key = create_random_api_key(db)
+    newer = datetime.now(timezone.utc)
+    older = newer - timedelta(minutes=1)
+
+    crud.update_api_keys_last_used(session=db, last_used={api_key.id: newer})
+    crud.update_api_keys_last_used(session=db, last_used={api_key.id: older})
+
+    db.refresh(api_key)
+    assert api_key.last_used_at == newer
+
+
+def test_update_api_keys_last_used_empty(db: Session) -> None:
+    crud.update_api_keys_last_used(session=db, last_used={})
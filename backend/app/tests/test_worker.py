@@ -0,0 +1,84 @@
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import orjson
+from fastapi.testclient import TestClient
+
+from app.core.queue import get_linkedin_auth_state
+from app.core.security import encrypt_secret
+from app.tests.utils.utils import call_in_app
+from app.worker import linkedin_auth
+
+LoginHandler = Callable[[httpx.Request], httpx.Response]
+
+
+def linkedin_login(login_response: httpx.Response) -> LoginHandler:
+    """LinkedIn stand-in answering the credential login with login_response"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, headers={"set-cookie": "JSESSIONID=ajax:1"})
+        assert b"session_password=secret" in request.content
+        return login_response
+
+    return handler
+
+
+def run_linkedin_auth(
+    client: TestClient, handler: LoginHandler, credentials: str | None = None
+) -> dict[str, Any] | None:
+    account_id = str(uuid.uuid4())
+    if credentials is None:
+        credentials = encrypt_secret(
+            orjson.dumps(
+                {"username": "user@example.com", "password": "secret"}
+            ).decode()
+        )
+    ctx = {"linkedin_transport": httpx.MockTransport(handler)}
+    call_in_app(client, linkedin_auth, ctx, account_id, "owner", credentials)
+    return call_in_app(client, get_linkedin_auth_state, account_id)
+
+
+def test_linkedin_auth_ok(client: TestClient) -> None:
+    handler = linkedin_login(
+        httpx.Response(
+            200,
+            json={"login_result": "PASS"},
+            headers={"set-cookie": "li_at=token"},
+        )
+    )
+    assert run_linkedin_auth(client, handler) == {"owner_id": "owner", "status": "OK"}
+
+
+def test_linkedin_auth_challenge(client: TestClient) -> None:
+    challenge_url = "https://www.linkedin.com/checkpoint/lg/login-two-factor"
+    handler = linkedin_login(
+        httpx.Response(
+            200, json={"login_result": "CHALLENGE", "challenge_url": challenge_url}
+        )
+    )
+    assert run_linkedin_auth(client, handler) == {
+        "owner_id": "owner",
+        "status": "CHALLENGE",
+        "checkpoint": {"type": "2FA", "url": challenge_url},
+    }
+
+
+def test_linkedin_auth_failed(client: TestClient) -> None:
+    handler = linkedin_login(httpx.Response(401))
+    state = run_linkedin_auth(client, handler)
+    assert state
+    assert state["status"] == "FAILED"
+    assert state["detail"] == "LinkedIn authentication failed. Invalid credentials."
+
+
+def test_linkedin_auth_invalid_credentials_token(client: TestClient) -> None:
+    handler = linkedin_login(httpx.Response(200, json={"login_result": "PASS"}))
+    state = run_linkedin_auth(client, handler, credentials="not-a-token")
+    assert state == {
+        "owner_id": "owner",
+        "status": "FAILED",
+        "detail": "LinkedIn authentication failed",
+    }
@@ -0,0 +1,46 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import ApiKey, ScopeType, scopes_to_mask
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def create_api_key(
+    client: TestClient,
+    headers: dict[str, str],
+    name: str = "Test key",
+    scopes: list[str] | None = None,
+) -> dict[str, Any]:
+    data = {
+        "name": name,
+        "scopes": scopes or ["accounts:read"],
+        "expiry_days": 30,
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/api-keys",
+        headers=headers,
+        json=data,
+    )
+    assert response.status_code == 201
+    content: dict[str, Any] = response.json()
+    return content
+
+
+def create_random_api_key(db: Session) -> ApiKey:
+    user = create_random_user(db)
+    _, key_prefix, hashed_key = ApiKey.generate_key()
+    api_key = ApiKey(
+        name=random_lower_string(),
+        key_prefix=key_prefix,
+        hashed_key=hashed_key,
+        scopes_mask=scopes_to_mask([ScopeType.ACCOUNTS_READ]),
+        owner_id=user.id,
+    )
+    db.add(api_key)
+    db.commit()
+    db.refresh(api_key)
+    return api_key
@@ -1,10 +1,14 @@
 import random
 import string
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
 
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
 
 def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=32))
@@ -24,3 +28,9 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+def call_in_app(client: TestClient, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+    """Run a coroutine function in the app's event loop, which owns the Redis client"""
+    assert client.portal
+    return client.portal.call(func, *args)
@@ -0,0 +1,70 @@
+import logging
+from typing import Any
+
+import orjson
+from arq import func
+from fastapi import HTTPException
+
+from app.api.routes.account import LinkedInClient, create_linkedin_transport
+from app.core.cache import close_redis, init_redis
+from app.core.config import settings
+from app.core.queue import redis_settings, set_linkedin_auth_state
+from app.core.security import decrypt_secret
+
+logger = logging.getLogger(__name__)
+
+
+async def linkedin_auth(
+    ctx: dict[str, Any], account_id: str, owner_id: str, credentials: str
+) -> None:
+    """
+    Log in to LinkedIn with credentials and record the outcome for polling.
+    credentials is the encrypted username and password, see encrypt_secret.
+    """
+    state: dict[str, Any] = {"owner_id": owner_id}
+    try:
+        login = orjson.loads(
+            decrypt_secret(credentials, ttl=settings.LINKEDIN_AUTH_STATE_TTL_SECONDS)
+        )
+        async with LinkedInClient(transport=ctx["linkedin_transport"]) as client:
+            auth_result = await client.authenticate_with_credentials(
+                login["username"], login["password"]
+            )
+    except HTTPException as e:
+        state.update(status="FAILED", detail=e.detail)
+    except Exception:
+        logger.exception(f"LinkedIn authentication for account {account_id} failed")
+        state.update(status="FAILED", detail="LinkedIn authentication failed")
+    else:
+        if auth_result.get("status") == "CHALLENGE":
+            state.update(
+                status="CHALLENGE",
+                checkpoint={
+                    "type": auth_result.get("challenge_type", "UNKNOWN"),
+                    "url": auth_result.get("challenge_url", ""),
+                },
+            )
+        else:
+            state.update(status="OK")
+
+    await set_linkedin_auth_state(account_id, state)
+
+
+async def startup(ctx: dict[str, Any]) -> None:
+    # Shared LinkedIn connection pool, so TLS connections are reused
+    ctx["linkedin_transport"] = create_linkedin_transport()
+    init_redis()
+
+
+async def shutdown(ctx: dict[str, Any]) -> None:
+    await ctx["linkedin_transport"].aclose()
+    await close_redis()
+
+
+class WorkerSettings:
+    # A login is never retried, and the job result (which would keep the
+    # encrypted credentials passed as arguments) is not stored
+    functions = [func(linkedin_auth, max_tries=1, keep_result=0)]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = redis_settings